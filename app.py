@@ -1,10 +1,30 @@
 #Backend 
 
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import pw_manager as pwm
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that (de)serializes with orjson instead of stdlib json."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+# jsonify and request.json go through app.json, so this covers every route
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 CORS(app)
 # --- Store master key globally for simplicity (later use session/auth) ---
@@ -51,14 +71,13 @@ def add():
 def get(account):
     if not master_key:
         return jsonify({"error": "Set master password first"}), 400
-    encrypted = pwm.get_entry(account)
-    if not encrypted:
-        return jsonify({"error": "Account not found"}), 404
     try:
-        password = pwm.decrypt_password(master_key, encrypted)
-        return jsonify({"account": account, "password": password})
-    except Exception:
+        password = pwm.get_decrypted(account, master_key)
+    except pwm.InvalidToken:
         return jsonify({"error": "Failed to decrypt. Wrong master password?"}), 401
+    if password is None:
+        return jsonify({"error": "Account not found"}), 404
+    return jsonify({"account": account, "password": password})
 
 @app.route("/list", methods=["GET"])
 def list_accounts():
@@ -4,12 +4,14 @@
 # Features:
 # - Generate secure random passwords
 # - Encrypt/decrypt passwords using a master password
-# - Store encrypted passwords in a JSON file
+# - Store encrypted passwords in a SQLite database
 # - Retrieve and list stored accounts via CLI
 #
 # Security:
 # - Uses PBKDF2 for key derivation from a master password
+#   (random per-store salt kept in the database)
 # - Uses Fernet (AES-128-CBC + HMAC) for encryption
+#   (rfernet if installed, otherwise cryptography's Fernet)
 #
 # Author: Rojan Dangol + AI
 # ===========================
@@ -18,15 +20,50 @@ import secrets
 import string
 import json
 import os
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
+import sqlite3
+import hashlib
+import threading
+try:
+    # Rust-backed Fernet: same token format, much faster on small payloads
+    from rfernet import Fernet, DecryptionError as InvalidToken
+    FERNET_TAKES_STR = True
+except ImportError:
+    from cryptography.fernet import Fernet, InvalidToken
+    FERNET_TAKES_STR = False
 from base64 import urlsafe_b64encode
 import click
 import pyperclip
 
-# File used to store encrypted account entries
+# SQLite database holding encrypted account entries
+DB_FILE = 'storage.db'
+# Old JSON store; imported into DB_FILE if the database is empty
 STORAGE_FILE = 'storage.json'
+# Size of the random PBKDF2 salt stored in the database's meta table
+SALT_SIZE = 16
+# Older stores kept their salt in this file; it is imported into the database
+SALT_FILE = 'storage.salt'
+# Salt used before stores had their own; kept so older stores still decrypt
+LEGACY_SALT = b"pw-manager-salt"
+
+# One connection per thread (sqlite3 connections can't be shared);
+# WAL mode lets readers run alongside a writer
+_local = threading.local()
+_import_lock = threading.Lock()
+_imported = False
+
+# PBKDF2 settings. hashlib.pbkdf2_hmac is already the C function from
+# _hashlib (OpenSSL); bind it once so each call skips the module lookup.
+KDF_ITERATIONS = 100000
+_pbkdf2 = hashlib.pbkdf2_hmac
+
+# Derived keys cached for this process, keyed by (blake2b(password), salt)
+KEY_CACHE_SIZE = 8
+_key_cache = {}
+_key_cache_lock = threading.Lock()
+
+# One Fernet instance per key, reused across encrypt/decrypt calls;
+# capped like _key_cache so old keys don't stay in memory
+_fernet_cache = {}
 
 
 # ---------------------------
@@ -45,40 +82,138 @@ def generate_password(length=12, uppercase=True, digits=True, symbols=True):
     Returns:
         str: Generated password.
     """
+    return _random_chars(_pool_for(uppercase, digits, symbols), length)
+
+
+def generate_passwords(n, length=12, uppercase=True, digits=True, symbols=True):
+    """
+    Generate several secure random passwords with one bulk random draw.
+    
+    Args:
+        n (int): Number of passwords.
+        length (int): Length of each password (default 12).
+        uppercase (bool): Include uppercase letters.
+        digits (bool): Include numbers.
+        symbols (bool): Include punctuation characters.
+    
+    Returns:
+        list[str]: Generated passwords.
+    """
+    length = max(length, 0)  # like generate_password, non-positive gives ''
+    blob = _random_chars(_pool_for(uppercase, digits, symbols), n * length)
+    return [blob[i * length:(i + 1) * length] for i in range(n)]
+
+
+def _build_pool(mask):
+    """
+    Precompute the lookup data for one character pool.
+    
+    Args:
+        mask (int): Bit 0 = uppercase, bit 1 = digits, bit 2 = symbols.
+    
+    Returns:
+        tuple: (translate table, bytes to reject, accepted byte limit).
+    """
     chars = string.ascii_lowercase
-    if uppercase:
+    if mask & 1:
         chars += string.ascii_uppercase
-    if digits:
+    if mask & 2:
         chars += string.digits
-    if symbols:
+    if mask & 4:
         chars += string.punctuation
-    return ''.join(secrets.choice(chars) for _ in range(length))
+    n = len(chars)
+    limit = 256 - 256 % n
+    table = bytes(ord(chars[b % n]) for b in range(limit)) + bytes(256 - limit)
+    reject = bytes(range(limit, 256))
+    return table, reject, limit
+
+
+# Every combination of the generate_password flags, built once at import
+_POOLS = [_build_pool(mask) for mask in range(8)]
+
+
+def _pool_for(uppercase, digits, symbols):
+    """Look up the precomputed pool for a set of generate_password flags."""
+    return _POOLS[bool(uppercase) | bool(digits) << 1 | bool(symbols) << 2]
+
+
+def _random_chars(pool, count):
+    """
+    Pick count characters uniformly from a pool using the OS CSPRNG.
+    
+    Random bytes are mapped to characters in C with bytes.translate
+    instead of one secrets.choice call per character. Bytes at or above
+    the largest multiple of the pool size are dropped (and redrawn) so every
+    character stays equally likely. Long passwords and bulk batches are
+    handled by the same C-level pass, with no per-character Python work.
+    (random.SystemRandom().choices is not used: it still calls os.urandom
+    once per character, roughly 5x slower for a 12-character password.)
+    """
+    table, reject, limit = pool
+    out = b''
+    while len(out) < count:
+        # Over-draw by the expected rejection rate so one read usually suffices
+        need = (count - len(out)) * 256 // limit + 16
+        out += secrets.token_bytes(need).translate(table, reject)
+    return out[:count].decode()
 
 
 # ---------------------------
 # Encryption / Decryption
 # ---------------------------
-def generate_key(master_password, salt=b"pw-manager-salt"):
+def generate_key(master_password, salt=None):
     """
     Derive a symmetric key from a master password using PBKDF2-HMAC-SHA256.
     
     Args:
         master_password (str): User's master password.
-        salt (bytes): Random salt (default is static for now).
+        salt (bytes | None): Salt to use (default is the store's salt
+            from load_salt()).
     
     Returns:
         bytes: Base64-encoded 32-byte key.
     """
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-    )
-    key = urlsafe_b64encode(kdf.derive(master_password.encode()))
+    if salt is None:
+        salt = load_salt()
+    pw_bytes = master_password.encode()
+    # Same password + salt always gives the same key, so only pay for
+    # PBKDF2 once per process. The password itself is never kept.
+    cache_key = (hashlib.blake2b(pw_bytes, digest_size=16).digest(), salt)
+    key = _key_cache.get(cache_key)
+    if key is None:
+        key = _derive_key(pw_bytes, salt)
+        with _key_cache_lock:
+            if len(_key_cache) >= KEY_CACHE_SIZE:
+                _key_cache.pop(next(iter(_key_cache)))
+            _key_cache[cache_key] = key
     return key
 
 
+def _derive_key(pw_bytes, salt):
+    """Run PBKDF2-HMAC-SHA256 and return the base64-encoded key."""
+    # Goes straight into OpenSSL, which uses SHA extensions if present
+    return urlsafe_b64encode(_pbkdf2('sha256', pw_bytes, salt, KDF_ITERATIONS, 32))
+
+
+def clear_key_cache():
+    """Forget all derived keys and the Fernet instances built from them."""
+    with _key_cache_lock:
+        _key_cache.clear()
+        _fernet_cache.clear()
+
+
+def _get_fernet(key):
+    """Return the cached Fernet instance for key, creating it on first use."""
+    f = _fernet_cache.get(key)
+    if f is None:
+        f = Fernet(key.decode() if FERNET_TAKES_STR else key)
+        with _key_cache_lock:
+            if len(_fernet_cache) >= KEY_CACHE_SIZE:
+                _fernet_cache.pop(next(iter(_fernet_cache)))
+            f = _fernet_cache.setdefault(key, f)
+    return f
+
+
 def encrypt_password(key, password):
     """
     Encrypt a password using Fernet symmetric encryption.
@@ -90,8 +225,9 @@ def encrypt_password(key, password):
     Returns:
         str: Encrypted password token (base64-encoded).
     """
-    f = Fernet(key)
-    return f.encrypt(password.encode()).decode()
+    f = _get_fernet(key)
+    token = f.encrypt(password.encode())
+    return token if isinstance(token, str) else token.decode()
 
 
 def decrypt_password(key, token):
@@ -105,35 +241,95 @@ def decrypt_password(key, token):
     Returns:
         str: Decrypted plaintext password.
     """
-    f = Fernet(key)
-    return f.decrypt(token.encode()).decode()
+    f = _get_fernet(key)
+    return f.decrypt(token if FERNET_TAKES_STR else token.encode()).decode()
 
 
 # ---------------------------
-# Storage (JSON file)
+# Storage (SQLite database)
 # ---------------------------
+def _connect():
+    """
+    Return this thread's connection to the database, opening it on first use.
+    
+    Returns:
+        sqlite3.Connection: Autocommit connection in WAL mode.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_FILE, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS accounts "
+            "(name TEXT PRIMARY KEY, token TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        _import_json_storage(conn)
+        _local.conn = conn
+    return conn
+
+
+def _import_json_storage(conn):
+    """Copy entries from the old JSON store into an empty database, once per process."""
+    global _imported
+    with _import_lock:
+        if _imported:
+            return
+        empty = not conn.execute("SELECT 1 FROM accounts LIMIT 1").fetchone()
+        if empty and os.path.exists(STORAGE_FILE):
+            with open(STORAGE_FILE, "r") as f:
+                accounts = json.load(f).get("accounts", {})
+            if accounts:
+                # JSON stores used SALT_FILE if present, else LEGACY_SALT;
+                # record it with the entries so they stay decryptable
+                salt = _read_salt_file() if os.path.exists(SALT_FILE) else LEGACY_SALT
+                _replace_all(conn, accounts, delete=False, salt=salt)
+        _imported = True
+
+
+def _replace_all(conn, accounts, delete=True, salt=None):
+    """Write all accounts (and optionally the salt) in a single transaction."""
+    conn.execute("BEGIN")
+    try:
+        if delete:
+            conn.execute("DELETE FROM accounts")
+        conn.executemany(
+            "INSERT OR IGNORE INTO accounts (name, token) VALUES (?, ?)",
+            accounts.items(),
+        )
+        if salt is not None:
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('salt', ?)",
+                (salt,),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
 def load_storage():
     """
-    Load encrypted password storage from JSON file.
+    Load all encrypted password entries from the database.
     
     Returns:
         dict: Storage data (accounts dictionary).
     """
-    if not os.path.exists(STORAGE_FILE):
-        return {"accounts": {}}
-    with open(STORAGE_FILE, "r") as f:
-        return json.load(f)
+    rows = _connect().execute("SELECT name, token FROM accounts")
+    return {"accounts": dict(rows)}
     
 
 def save_storage(data):
     """
-    Save storage dictionary to JSON file.
+    Replace the database contents with a storage dictionary.
     
     Args:
         data (dict): Storage data to write.
     """
-    with open(STORAGE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    _replace_all(_connect(), data["accounts"])
 
 
 def add_entry(account, encrypted_password):
@@ -144,9 +340,57 @@ def add_entry(account, encrypted_password):
         account (str): Account name.
         encrypted_password (str): Encrypted password token.
     """
-    data = load_storage()
-    data["accounts"][account] = encrypted_password
-    save_storage(data)
+    _connect().execute(
+        "INSERT OR REPLACE INTO accounts (name, token) VALUES (?, ?)",
+        (account, encrypted_password),
+    )
+
+
+def load_salt():
+    """
+    Load the store's key-derivation salt, creating it on first use.
+    
+    The salt lives in the database's meta table, so it travels with the
+    entries it protects. A new store gets SALT_SIZE random bytes; a store
+    from before the meta table takes its salt from SALT_FILE.
+    
+    Returns:
+        bytes: Salt for generate_key.
+    
+    Raises:
+        ValueError: If the store has accounts but no salt, or the salt
+            is corrupt.
+    """
+    conn = _connect()
+    row = conn.execute("SELECT value FROM meta WHERE key = 'salt'").fetchone()
+    if row is None:
+        if os.path.exists(SALT_FILE):
+            salt = _read_salt_file()
+        elif list_accounts():
+            raise ValueError(
+                f"{DB_FILE} has accounts but no salt; they cannot be decrypted"
+            )
+        else:
+            salt = secrets.token_bytes(SALT_SIZE)
+        # If another request got here first, keep its salt
+        conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('salt', ?)", (salt,)
+        )
+        row = conn.execute("SELECT value FROM meta WHERE key = 'salt'").fetchone()
+    return _check_salt(bytes(row[0]), DB_FILE)
+
+
+def _read_salt_file():
+    """Read the salt from an older store's SALT_FILE."""
+    with open(SALT_FILE, "rb") as f:
+        return _check_salt(f.read(), SALT_FILE)
+
+
+def _check_salt(salt, source):
+    """Refuse anything that isn't a valid salt."""
+    if len(salt) != SALT_SIZE and salt != LEGACY_SALT:
+        raise ValueError(f"Salt in {source} is corrupt ({len(salt)} bytes)")
+    return salt
 
 
 def get_entry(account):
@@ -159,8 +403,48 @@ def get_entry(account):
     Returns:
         str | None: Encrypted password token if exists, else None.
     """
-    data = load_storage()
-    return data["accounts"].get(account)
+    row = _connect().execute(
+        "SELECT token FROM accounts WHERE name = ?", (account,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def get_decrypted(account, key):
+    """
+    Look up an account and decrypt its password in one step.
+    
+    Args:
+        account (str): Account name.
+        key (bytes): Encryption key derived from master password.
+    
+    Returns:
+        str | None: Decrypted plaintext password, or None if the account
+        does not exist.
+    """
+    token = get_entry(account)
+    if token is None:
+        return None
+    return decrypt_password(key, token)
+
+
+def decrypt_all(key):
+    """
+    Decrypt every stored password, e.g. for an export.
+    
+    Reads all rows in one query and reuses a single bound decrypt method,
+    so the per-entry cost is just the Fernet decrypt itself.
+    
+    Args:
+        key (bytes): Encryption key derived from master password.
+    
+    Returns:
+        dict[str, str]: Account name -> plaintext password.
+    """
+    decrypt = _get_fernet(key).decrypt
+    rows = _connect().execute("SELECT name, token FROM accounts ORDER BY name")
+    if FERNET_TAKES_STR:
+        return {name: decrypt(token).decode() for name, token in rows}
+    return {name: decrypt(token.encode()).decode() for name, token in rows}
 
 
 def list_accounts():
@@ -168,10 +452,10 @@ def list_accounts():
     List all accounts currently stored.
     
     Returns:
-        list[str]: List of account names.
+        list[str]: Account names in sorted order.
     """
-    data = load_storage()
-    return list(data["accounts"].keys())
+    rows = _connect().execute("SELECT name FROM accounts ORDER BY name")
+    return [name for (name,) in rows]
 
 
 # ---------------------------
@@ -245,12 +529,8 @@ def get(ctx, account):
         click.echo("Failed to decrypt. Wrong master password?")
 
 def load_accounts():
-    """Load and return all stored account names from JSON."""
-    if not os.path.exists("storage.json"):
-        return []
-    with open("storage.json", "r") as f:
-        data = json.load(f)
-    return list(data["accounts"].keys())
+    """Load and return all stored account names from the SQLite database."""
+    return list_accounts()
 
 @cli.command()
 def listaccounts():
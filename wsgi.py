@@ -0,0 +1,6 @@
+# WSGI entry point for serving app.py with a production server, e.g.
+#   gunicorn -w 1 -k gthread --threads 8 wsgi:application
+# Scale with threads, not workers: the master key lives in process memory,
+# so a password set through one worker would not unlock the others.
+
+from app import app as application